@@ -13,16 +13,29 @@ Error codes from 0 to 256 are encoded, which makes sure we can pretty -> deprett
 handle any 8-bit encoding run with uxreplace error handling. Anything weirder is non-reversible and will
 send junk data.
 
+Escapes are strict when encoding: "˟" must be followed directly by two hex digits (a line continuation in between
+is fine), so something like "˟\n41" raises UnicodeEncodeError instead of quietly treating the newline as a break.
+
 For valid ascii, encode("prettyascii") == encode("ascii") except for line terminators, which are single \ns always
+
+Serial captures can get big, so neither direction loops over characters in python: decoding runs through
+bytes.decode / codecs.charmap_decode and str.replace, and encoding through str.translate and compiled regexes,
+which only drop back into python for escape sequences. All of these are C loops already, so there's no compiled
+extension to build.
 """
 
 import codecs
+import re
+import string
+from types import MappingProxyType
 from typing import Tuple
 
 from serialhunter import BYTESTRING_CHARACTER, NEWLINE_CHARACTER
 
 COLUMN_WIDTH = 80
 
+_ONE_BYTES = tuple(bytes((n,)) for n in range(256))
+
 ESCAPE_SEQUENCES = {n: f"{BYTESTRING_CHARACTER}{n:x}" for n in range(256)}
 BASE_ASCII = {n: chr(n) for n in range(128)}
 CHAR_UPDATE_DICT = {
@@ -44,96 +57,230 @@ CHAR_UPDATE_DICT = {
     0x7F: "␡",
 }
 
-byte_to_chars = ESCAPE_SEQUENCES.copy()
-byte_to_chars.update(BASE_ASCII)
-byte_to_chars.update(CHAR_UPDATE_DICT)
-
-
 # run dicts in order to overwrite
-
-char_to_bytes = {
-    char: byte.to_bytes(1, "little")
-    for byte, char in list(byte_to_chars.items()) + list(BASE_ASCII.items())
-    if len(char) == 1
-}
+byte_to_chars = MappingProxyType({**ESCAPE_SEQUENCES, **BASE_ASCII, **CHAR_UPDATE_DICT})
+
+# positional lookup tables for decoding, indexed directly by byte value
+BYTE_TO_CHARS_TABLE = tuple(byte_to_chars[b] for b in range(256))
+IS_NEWLINE_TABLE = tuple(b in (0x0A, 0x0D) for b in range(256))
+# the few ascii characters that get prettified, as (character, replacement) pairs
+_ASCII_GLYPHS = tuple(
+    (chr(b), BYTE_TO_CHARS_TABLE[b])
+    for b in range(128)
+    if BYTE_TO_CHARS_TABLE[b] != chr(b)
+)
+
+# newline bytes decode to glyphs; a real line break goes after each run of them
+_NEWLINE_GLYPHS = tuple(
+    BYTE_TO_CHARS_TABLE[b] for b in range(256) if IS_NEWLINE_TABLE[b]
+)
+
+
+char_to_bytes = MappingProxyType(
+    {
+        char: _ONE_BYTES[byte]
+        for byte, char in (*byte_to_chars.items(), *BASE_ASCII.items())
+        if len(char) == 1
+    }
+)
+
+# single-pass character substitutions: pretty glyphs back to their raw characters, and every
+# newline variant to \n (which collapses into a single line break afterwards)
+_NEWLINE_CHARS = ("\r", "\n", "␍", "␊")
+_ENCODE_TRANSLATION = str.maketrans(
+    {
+        **{
+            char: chr(byte[0])
+            for char, byte in char_to_bytes.items()
+            if char != chr(byte[0])
+        },
+        **{char: "\n" for char in _NEWLINE_CHARS},
+    }
+)
+# the same mapping flattened into a tuple indexed by code point, built once here so
+# str.translate does a positional lookup per character instead of a dict probe (anything past
+# the end of the table is left unchanged)
+_ENCODE_TABLE = tuple(
+    _ENCODE_TRANSLATION.get(n, chr(n)) for n in range(max(_ENCODE_TRANSLATION) + 1)
+)
+
+# hex digit values by code point, -1 for anything that isn't a hex digit
+HEX_VAL = tuple(
+    int(chr(n), 16) if chr(n) in string.hexdigits else -1 for n in range(128)
+)
+
+# line continuations (and the character after them) are stripped before anything else
+_CONTINUATION_RE = re.compile(re.escape(NEWLINE_CHARACTER) + ".?", re.DOTALL)
+_NEWLINE_RUN_RE = re.compile("\n+")
+
+# everything left that the encoder can't just pass through, as a single alternation so each chunk
+# of text is scanned once; the plain ascii runs between matches are copied through in bulk
+_SPECIAL_RE = re.compile(
+    f"(?P<escape>{re.escape(BYTESTRING_CHARACTER)}[0-9a-fA-F]{{0,2}})"
+    "|(?P<invalid>[^\x00-\x7f→])"
+)
+# the same checks as above, for finding the first bad escape (one that isn't a complete escape,
+# or a partial one at the very end) or unmapped character before glyphs are translated
+_ENCODE_ERROR_RE = re.compile(
+    f"(?P<escape>{re.escape(BYTESTRING_CHARACTER)}(?![0-9a-fA-F]{{2}}|[0-9a-fA-F]?\\Z))"
+    "|(?P<invalid>[^\x00-\x7f"
+    + re.escape(
+        "".join(char for char in char_to_bytes if ord(char) >= 128)
+        + BYTESTRING_CHARACTER
+        + "→"
+    )
+    + "])"
+)
+
+
+# encoder state is packed into one int, so it can be passed straight through getstate/setstate:
+# bit 0 skips the next character (after a line continuation), bit 1 means the last chunk ended
+# on a newline so a leading one is dropped, and the rest track an escape sequence split across
+# chunks: 0 for none, 1 after the escape character, or 2 + the high nibble after its first digit
+_SKIP_NEXT = 0b01
+_SKIP_NEWLINES = 0b10
+_ESCAPE_SHIFT = 2
+
+
+def _pack_state(skip_next: bool, skip_newlines: bool, escape_state: int) -> int:
+    state = escape_state << _ESCAPE_SHIFT
+    if skip_next:
+        state |= _SKIP_NEXT
+    if skip_newlines:
+        state |= _SKIP_NEWLINES
+    return state
+
+
+def _encode_error(data: str, raw: str, offset: int) -> UnicodeEncodeError:
+    """Build the error for the first bad escape or unmapped character in a chunk
+
+    This only runs once encoding has already failed. raw is the chunk before line continuations
+    were stripped, and raw[0] is data[offset]. offset is negative when a split escape was put back
+    in front of the chunk."""
+    # strip the continuations again, remembering where each remaining character came from
+    kept = []
+    i = 0
+    while i < len(raw):
+        if raw[i] == NEWLINE_CHARACTER:
+            i += 2
+        else:
+            kept.append(i)
+            i += 1
+    stripped = "".join(raw[i] for i in kept)
+
+    match = _ENCODE_ERROR_RE.search(stripped)
+    if match.lastgroup == "escape":
+        # the escape character plus the two characters that should have been its digits
+        end = min(match.start() + 3, len(stripped))
+        reason = "invalid escape sequence"
+    else:
+        end = match.end()
+        reason = "character has no pretty mapping"
+    return UnicodeEncodeError(
+        "prettyascii",
+        data,
+        max(kept[match.start()] + offset, 0),
+        kept[end - 1] + offset + 1,
+        reason,
+    )
 
 
-def encode_pretty(
-    data: str,
-    skip_next=False,
-    skip_newlines=False,
-    escape_count=0,
-) -> Tuple[bytes, bool, bool, int]:
-    """Convert a string (possibly containing prettified values) into bytes"""
-    out_bytes = bytes()
-    escape_buffer = ""
-    for i, c in enumerate(data):
-        if skip_next:
-            skip_next = False
-            continue
-
-        # check for line continuation:
-        if c == NEWLINE_CHARACTER:
-            skip_next = True
-            continue
-
-        # check for newline options:
-        if c in ["\r", "\n", "␍", "␊"]:
-            if not skip_newlines:
-                out_bytes += b"\n"
-                skip_newlines = True
-            continue
-        skip_newlines = False
-
-        # check for escape strings (of the type ˟FF)
-        if c == BYTESTRING_CHARACTER:
-            # we have an escape string
-            if escape_count > 0:
-                raise UnicodeEncodeError(
-                    __encoding="prettyascii",
-                    __object=data,
-                    __start=i - len(escape_buffer) - 1,
-                    __end=i + 1,
-                    __reason=f"Invalid escape char: {c} with buffer {escape_buffer}",
-                )
-            escape_count = 2
-            continue
-        if escape_count:
-            escape_buffer += c
-            escape_count -= 1
-            if escape_count == 0:
-                out_bytes += int(escape_buffer, 16).to_bytes(1, "little")
-                escape_buffer = ""
-            continue
-
-        # check for tab symbol:
-        if c == "→":
-            continue
-
-        out_bytes += char_to_bytes[c]
-
-    return out_bytes, skip_next, skip_newlines, escape_count
+def encode_pretty(data: str, state=0) -> Tuple[bytes, int]:
+    """Convert a string (possibly containing prettified values) into bytes
+
+    state carries over from the previous chunk when encoding incrementally, and the state for the
+    next chunk is returned along with the bytes."""
+    skip_next = bool(state & _SKIP_NEXT)
+    skip_newlines = bool(state & _SKIP_NEWLINES)
+    escape_state = state >> _ESCAPE_SHIFT
+
+    text = data
+    offset = 0  # position of text[0] in data, for error reporting
+    if skip_next and text:
+        text = text[1:]
+        offset = 1
+        skip_next = False
+    if escape_state:
+        # resume the split escape by putting its start back in front
+        pending = BYTESTRING_CHARACTER
+        if escape_state > 1:
+            pending += string.hexdigits[escape_state - 2]
+        text = pending + text
+        offset -= len(pending)
+        escape_state = 0
+    raw = text
+
+    if NEWLINE_CHARACTER in text:
+        # a trailing continuation drops the first character of the next chunk instead
+        skip_next = bool((len(text) - len(text.rstrip(NEWLINE_CHARACTER))) % 2)
+        text = _CONTINUATION_RE.sub("", text)
+    if not text:
+        return b"", _pack_state(skip_next, skip_newlines, escape_state)
+
+    # collapse sequential newlines in one go, including a run continued from the last chunk
+    text = _NEWLINE_RUN_RE.sub("\n", text.translate(_ENCODE_TABLE))
+    if skip_newlines and text[0] == "\n":
+        text = text[1:]
+    skip_newlines = text[-1:] == "\n" or (not text and skip_newlines)
+
+    parts = []
+    pos = 0
+    for match in _SPECIAL_RE.finditer(text):
+        start, end = match.span()
+        parts.append(text[pos:start])
+        pos = end
+
+        if match.lastgroup == "escape":
+            if end - start == 3:
+                high = HEX_VAL[ord(text[start + 1])]
+                parts.append(chr((high << 4) | HEX_VAL[ord(text[start + 2])]))
+            elif end == len(text):
+                # hold back an escape split across calls
+                if end - start == 1:
+                    escape_state = 1
+                else:
+                    escape_state = 2 + HEX_VAL[ord(text[start + 1])]
+            else:
+                raise _encode_error(data, raw, offset)
+        else:
+            raise _encode_error(data, raw, offset)
+    parts.append(text[pos:])
+
+    # tab symbols follow a literal tab, and are dropped. escapes are the only non-ascii
+    # characters left after that, and map straight to their byte values
+    out_bytes = "".join(parts).replace("→", "").encode("latin-1")
+    return out_bytes, _pack_state(skip_next, skip_newlines, escape_state)
 
 
 def decode_pretty(data: bytes, was_newline=False) -> Tuple[str, bool]:
-    out_str = ""
-    # time_since_last_break = 0
-    for b in data:
-        is_newline = b in (10, 13)
-        next_chars = byte_to_chars[b]
-
-        # time_since_last_break += len(next_chars)
-        # if time_since_last_break >= COLUMN_WIDTH:
-        #     out_str += NEWLINE_CHARACTER + "\n"
-        #     time_since_last_break = 0
-
-        if not is_newline and was_newline:
-            out_str += "\n"
-            time_since_last_break = 0
-        was_newline = is_newline
-
-        out_str += next_chars
-    return out_str, was_newline
+    if not data:
+        return "", was_newline
+    if not isinstance(data, (bytes, bytearray)):
+        # other buffers (such as memoryview) have no isascii
+        data = bytes(data)
+
+    if data.isascii():
+        # ascii-only data (the usual case) decodes directly, and only the handful of special
+        # characters that are actually present need replacing
+        out_str = data.decode("ascii")
+        for char, glyph in _ASCII_GLYPHS:
+            if char in out_str:
+                out_str = out_str.replace(char, glyph)
+    else:
+        out_str = codecs.charmap_decode(data, "strict", BYTE_TO_CHARS_TABLE)[0]
+
+    # add the line breaks: one after every newline glyph, minus the ones that land inside a run
+    for glyph in _NEWLINE_GLYPHS:
+        out_str = out_str.replace(glyph, glyph + "\n")
+    for glyph in _NEWLINE_GLYPHS:
+        out_str = out_str.replace("\n" + glyph, glyph)
+
+    is_newline = IS_NEWLINE_TABLE[data[-1]]
+    if is_newline:
+        out_str = out_str[:-1]
+    if was_newline and not IS_NEWLINE_TABLE[data[0]]:
+        out_str = "\n" + out_str
+    return out_str, is_newline
 
 
 def encode_pretty_fn(data: str, errors: "strict"):
@@ -146,7 +293,7 @@ def decode_pretty_fn(data: bytes, errors: "strict"):
 
 class PrettyCodec(codecs.Codec):
     def encode(self, data, errors="strict"):
-        return encode_pretty(data)
+        return encode_pretty(data)[0], len(data)
 
     def decode(self, data, errors="strict"):
         return decode_pretty(data)
@@ -157,33 +304,21 @@ class PrettyIncrementalEncoder(codecs.IncrementalEncoder):
 
     def __init__(self, errors="strict"):
         super().__init__(errors)
-        self.skip_next = False
-        self.skip_newlines = False
-        self.escape_count = 0
+        self._state = 0
 
     def reset(self):
-        self.skip_next = False
-        self.skip_newlines = False
-        self.escape_count = 0
+        self._state = 0
 
     def getstate(self):
-        # reminder that since getstate and setstate must return int, we have to do some packing here:
-        return (
-            "",
-            int(self.skip_next) + int(self.skip_newlines) * 2 + self.escape_count * 4,
-        )
+        # encode_pretty already keeps its state packed into an int
+        return "", self._state
 
     def setstate(self, state: tuple):
-        buffer_, statevars = state
-        self.skip_next = bool(statevars % 2)
-        self.skip_newlines = bool((statevars // 2) % 4)
-        self.escape_count = statevars // 4
+        buffer_, self._state = state
 
     def encode(self, data, final=False):
-        return_bytes, self.skip_next, self.skip_newlines, self.escape_count = (
-            encode_pretty(data, self.skip_next, self.skip_newlines, self.escape_count)
-        )
-        if final and self.escape_count:
+        return_bytes, self._state = encode_pretty(data, self._state)
+        if final and self._state >> _ESCAPE_SHIFT:
             raise RuntimeError(
                 "Error decoding - final escape character not followed by two valid hex characters!"
             )
@@ -232,4 +367,9 @@ def getregentry():
     )
 
 
-codecs.register(lambda c: getregentry() if c == "prettyascii" else None)
+# built once, so lookups of other codecs that fall through to this search function are cheap
+_PRETTY_INFO = getregentry()
+# python 3.8 normalizes spaces in codec names to hyphens, later versions to underscores
+_ALIASES = frozenset(("prettyascii", "pretty_ascii", "pretty-ascii"))
+
+codecs.register(lambda c: _PRETTY_INFO if c in _ALIASES else None)
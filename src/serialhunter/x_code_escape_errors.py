@@ -2,6 +2,8 @@
 This is a codec error handler that replaces on-ascii bytes are shown as hex numbers prefixed by "˟", such as ˟F8
 
 This is mostly for use with the pretty unicode codec, to make reading raw serial data slightly friendlier.
+
+It is registered as "uxreplace", plus "uxreplace_decode" and "uxreplace_encode" for callers that only go one way.
 """
 
 from typing import Union, Tuple
@@ -9,25 +11,42 @@ import codecs
 
 from serialhunter import BYTESTRING_CHARACTER
 
+# replacement strings for single bad bytes, which is nearly every decode error
+HEX2 = tuple(f"{BYTESTRING_CHARACTER}{i:02X}" for i in range(256))
+
+
+def _uxreplace_encode(e: UnicodeEncodeError) -> Tuple[bytes, int]:
+    # re-encoding with backslashreplace isn't great for performance
+    # but also I'm not sure if this code path will ever get used?
+
+    cross_char = BYTESTRING_CHARACTER.encode(e.encoding, errors="ignore")
+    if not cross_char:
+        cross_char = b"x"
+
+    re_encoded_str = e.object.encode(e.encoding, errors="backslashreplace")
+    re_encoded_str = re_encoded_str.replace(b"\\U", cross_char)
+    return re_encoded_str, e.end
+
+
+def _uxreplace_decode(e: UnicodeDecodeError) -> Tuple[str, int]:
+    if e.end - e.start == 1:
+        return HEX2[e.object[e.start]], e.end
+    return BYTESTRING_CHARACTER + e.object[e.start : e.end].hex().upper(), e.end
+
 
 def x_code_escape_errors(
     e: Union[UnicodeDecodeError, UnicodeEncodeError]
-) -> Tuple[str, int]:
+) -> Tuple[Union[str, bytes], int]:
     if isinstance(e.object, str):
         # we are encoding a string
-        # re-encoding with backslashreplace isn't great for performance
-        # but also I'm not sure if this code path will ever get used?
-
-        cross_char = BYTESTRING_CHARACTER.encode(e.encoding, errors="ignore")
-        if not cross_char:
-            cross_char = b"x"
-
-        re_encoded_str = e.object.encode(e.encoding, errors="backslashreplace")
-        re_encoded_str = re_encoded_str.replace(b"\\U", cross_char)
-        return re_encoded_str, e.end
-
-    sub = BYTESTRING_CHARACTER + e.object[e.start : e.end].hex().upper()
-    return sub, e.end
+        return _uxreplace_encode(e)
+    return _uxreplace_decode(e)
 
 
 codecs.register_error("uxreplace", x_code_escape_errors)
+# direction-specific versions, for callers that know which way they're going and can skip the type check
+codecs.register_error("uxreplace_encode", _uxreplace_encode)
+codecs.register_error("uxreplace_decode", _uxreplace_decode)
+
+# the resolved handler, for callers that invoke it directly instead of going through the registry by name
+UXREPLACE = codecs.lookup_error("uxreplace")
@@ -1,5 +1,6 @@
 import pytest
 
+import codecs
 from typing import Union
 
 import serialhunter
@@ -40,12 +41,29 @@ class TestXCodeEscapeErrors:
         decoded_str = bad_string.decode("ascii", errors="uxreplace") + "x"
         assert decoded_str[-14:] == "9" + "˟81" * 4 + "x"
 
+    def test_error_decode_specialized(self, bad_string):
+        decoded_str = bad_string.decode("ascii", "uxreplace_decode")
+        assert decoded_str == bad_string.decode("ascii", "uxreplace")
+
+    def test_resolved_handler(self, bad_string):
+        from serialhunter.x_code_escape_errors import UXREPLACE
+
+        start = bad_string.index(b"\x81")
+        error = UnicodeDecodeError("ascii", bad_string, start, start + 1, "bad byte")
+        assert UXREPLACE is codecs.lookup_error("uxreplace")
+        assert UXREPLACE(error) == ("˟81", start + 1)
+
     def test_error_encode_ascii(self):
         bad_str = "this is a unicode string: 0123456789🐋0123456789"
         encoded_str = bad_str.encode("ascii", "uxreplace")
         assert b"0123456789x0001f40b0123456789" in encoded_str
         assert b"this is a unicode string" in encoded_str
 
+    def test_error_encode_specialized(self):
+        bad_str = "this is a unicode string: 0123456789🐋0123456789"
+        encoded_str = bad_str.encode("ascii", "uxreplace_encode")
+        assert encoded_str == bad_str.encode("ascii", "uxreplace")
+
 
 @pytest.fixture
 def every_byte_pair():
@@ -70,6 +88,17 @@ class TestEncodeDecodeMapping:
         assert "\n" in decoded
         assert serialhunter.BYTESTRING_CHARACTER + "ff" in decoded
 
+    def test_decode_plain_ascii(self):
+        assert decode_pretty(b"abcd") == ("abcd", False)
+        assert decode_pretty(b"abcd", True) == ("\nabcd", False)
+        assert decode_pretty(b"ab\r\n", True) == ("\nab␊␍", True)
+
+    def test_decode_buffers(self):
+        assert decode_pretty(bytearray(b"a\x81 b"))[0] == "a˟81·b"
+        decoder = codecs.getincrementaldecoder("prettyascii")()
+        assert decoder.decode(memoryview(b"a\x81 b")) == "a˟81·b"
+        assert decoder.decode(memoryview(b"ab")) == "ab"
+
     def test_decode_encode(self, every_byte_pair):
         twisted_str = encode_pretty(decode_pretty(every_byte_pair)[0])[0]
         assert twisted_str == mangle_newlines(every_byte_pair)
@@ -81,6 +110,39 @@ class TestEncodeDecodeMapping:
         twisted_str = decode_pretty(encode_pretty(every_ascii_string)[0])[0]
         assert "ABCDEFGHIJKLMNOPQRSTUVWXYZ" in twisted_str
 
+    def test_encode_line_continuation(self):
+        assert (
+            encode_pretty("abc" + serialhunter.NEWLINE_CHARACTER + "\ndef")[0]
+            == b"abcdef"
+        )
+
+    def test_encode_newline_runs(self):
+        assert encode_pretty("a\r\n␍␊\nb\n\t→\n")[0] == b"a\nb\n\t\n"
+
+    def test_encode_invalid_escape(self):
+        with pytest.raises(UnicodeEncodeError):
+            encode_pretty("abc" + serialhunter.BYTESTRING_CHARACTER + "zz")
+
+    def test_encode_newline_inside_escape(self):
+        with pytest.raises(UnicodeEncodeError):
+            encode_pretty(serialhunter.BYTESTRING_CHARACTER + "\n41")
+
+    def test_encode_unmapped_character(self):
+        with pytest.raises(UnicodeEncodeError):
+            encode_pretty("abc🐋")
+
+    def test_encode_error_position(self):
+        # the first escape and whale are valid or skipped by a line continuation
+        escape = serialhunter.BYTESTRING_CHARACTER
+        continuation = serialhunter.NEWLINE_CHARACTER
+        with pytest.raises(UnicodeEncodeError) as excinfo:
+            encode_pretty(f"{escape}4{continuation}x1 {escape}zz")
+        assert (excinfo.value.start, excinfo.value.end) == (6, 9)
+
+        with pytest.raises(UnicodeEncodeError) as excinfo:
+            encode_pretty(f"{continuation}🐋a🐋")
+        assert (excinfo.value.start, excinfo.value.end) == (3, 4)
+
 
 class TestPrettyCodec:
     def test_encode_codec(self, every_ascii_string):
@@ -88,3 +150,30 @@ class TestPrettyCodec:
         assert b"abcd" in encoded
         assert b"\n" in encoded
         assert len(every_ascii_string) == len(encoded)
+
+    def test_codec_aliases(self):
+        assert codecs.lookup("prettyascii") is codecs.lookup("pretty_ascii")
+        assert codecs.lookup("Pretty ASCII").name == "prettyascii"
+
+    def test_incremental_encode_split_escape(self):
+        encoder = codecs.getincrementalencoder("prettyascii")()
+        chunks = ["abc" + serialhunter.BYTESTRING_CHARACTER, "8", "1def"]
+        encoded = b"".join(encoder.encode(chunk) for chunk in chunks)
+        assert encoded + encoder.encode("", final=True) == b"abc\x81def"
+
+    def test_incremental_encode_state_roundtrip(self):
+        encoder = codecs.getincrementalencoder("prettyascii")()
+        encoder.encode("abc\n")
+        encoder.encode(serialhunter.BYTESTRING_CHARACTER + "8")
+        state = encoder.getstate()
+
+        resumed = codecs.getincrementalencoder("prettyascii")()
+        resumed.setstate(state)
+        assert resumed.encode("1\n", final=True) == b"\x81\n"
+        resumed.reset()
+        assert resumed.encode("\nabc", final=True) == b"\nabc"
+
+    def test_incremental_encode_split_newlines(self):
+        encoder = codecs.getincrementalencoder("prettyascii")()
+        chunks = ["abc\r", "\n", "\r\ndef"]
+        assert b"".join(encoder.encode(chunk) for chunk in chunks) == b"abc\ndef"